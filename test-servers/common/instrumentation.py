@@ -0,0 +1,145 @@
+import os
+import sys
+import gc
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+PROFILING_HOST = os.getenv('PROFILING_HOST', '127.0.0.1')
+PROFILING_PORT = int(os.getenv('PROFILING_PORT', 0))
+PROFILING_MAX_SECONDS = float(os.getenv('PROFILING_MAX_SECONDS', 30))
+PROFILING_TRACEMALLOC = os.getenv('PROFILING_TRACEMALLOC', 'false').lower() == 'true'
+PROFILING_TRACEMALLOC_FRAMES = int(os.getenv('PROFILING_TRACEMALLOC_FRAMES', 1))
+
+PHASE_DURATION = Histogram('phase_duration_seconds', 'Time spent in each processing phase in seconds', ['phase'])
+GC_PAUSE = Histogram('python_gc_pause_seconds', 'Garbage collector pause time in seconds', ['generation'],
+                     buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5))
+
+gc_pause_totals = [0.0, 0.0, 0.0]
+gc_pause_started = None
+gc_pause_by_generation = []
+profile_lock = threading.Lock()
+
+def gc_callback(phase, info):
+    global gc_pause_started
+    if phase == 'start':
+        gc_pause_started = time.perf_counter()
+    elif gc_pause_started is not None:
+        pause = time.perf_counter() - gc_pause_started
+        generation = info['generation']
+        gc_pause_totals[generation] += pause
+        gc_pause_by_generation[generation].observe(pause)
+        gc_pause_started = None
+
+def sample_stacks(seconds, hz):
+    """Sample all thread stacks and return them in collapsed-stack format"""
+    own_ident = threading.get_ident()
+    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks = {}
+    interval = 1.0 / hz
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            frames.append(thread_names.get(ident, str(ident)))
+            stack = ';'.join(reversed(frames))
+            stacks[stack] = stacks.get(stack, 0) + 1
+        time.sleep(interval)
+    return '\n'.join(f"{stack} {count}" for stack, count in sorted(stacks.items())) + '\n'
+
+def top_allocations(limit):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(PROFILING_TRACEMALLOC_FRAMES)
+        return "tracemalloc started, request again to see top allocations\n"
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f"traced current={current} peak={peak}"]
+    lines.extend(str(stat) for stat in snapshot.statistics('lineno')[:limit])
+    return '\n'.join(lines) + '\n'
+
+def thread_cpu_times():
+    cpu_times = {}
+    for thread in threading.enumerate():
+        try:
+            cpu_times[thread.name] = time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        except (AttributeError, OSError, TypeError):
+            continue
+    return cpu_times
+
+def runtime_health():
+    return {
+        "gc": {
+            "collections": [stats['collections'] for stats in gc.get_stats()],
+            "pause_seconds_total": gc_pause_totals,
+            "thresholds": gc.get_threshold(),
+            "counts": gc.get_count()
+        },
+        "thread_cpu_seconds": thread_cpu_times(),
+        "process_cpu_seconds": time.process_time(),
+        "tracemalloc_tracing": tracemalloc.is_tracing()
+    }
+
+class ProfilingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        try:
+            if url.path == '/debug/profile':
+                seconds = min(float(params.get('seconds', [5])[0]), PROFILING_MAX_SECONDS)
+                hz = min(max(float(params.get('hz', [100])[0]), 1), 1000)
+                # Sampling holds the GIL for every stack walk, so only one profile may run at a time
+                if not profile_lock.acquire(blocking=False):
+                    self.send_error(429, "A profile is already running")
+                    return
+                try:
+                    stacks = sample_stacks(seconds, hz)
+                finally:
+                    profile_lock.release()
+                self.respond(stacks, 'text/plain')
+            elif url.path == '/debug/heap':
+                if params.get('stop', ['0'])[0] == '1':
+                    tracemalloc.stop()
+                    self.respond("tracemalloc stopped\n", 'text/plain')
+                else:
+                    self.respond(top_allocations(int(params.get('limit', [25])[0])), 'text/plain')
+            elif url.path == '/debug/runtime':
+                self.respond(json.dumps(runtime_health(), indent=2), 'application/json')
+            else:
+                self.send_error(404)
+        except ValueError as e:
+            self.send_error(400, str(e))
+
+    def respond(self, body, content_type):
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_profiling_server(port, host=PROFILING_HOST):
+    # labels() takes the parent metric lock, which a scrape may hold when GC kicks in
+    gc_pause_by_generation[:] = [GC_PAUSE.labels(generation=str(generation)) for generation in range(3)]
+    gc.callbacks.append(gc_callback)
+    if PROFILING_TRACEMALLOC:
+        tracemalloc.start(PROFILING_TRACEMALLOC_FRAMES)
+    server = ThreadingHTTPServer((host, port), ProfilingHandler)
+    thread = threading.Thread(target=server.serve_forever, name='profiling-server', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,129 @@
+import os
+import time
+import logging
+from collections import deque
+import pika
+import requests
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TIMEOUT = float(os.getenv('STARTUP_TIMEOUT', 120))
+STARTUP_BACKOFF_INITIAL = float(os.getenv('STARTUP_BACKOFF_INITIAL', 0.5))
+STARTUP_BACKOFF_MAX = float(os.getenv('STARTUP_BACKOFF_MAX', 8))
+WARMUP_CHECK_INTERVAL = float(os.getenv('WARMUP_CHECK_INTERVAL', 5))
+WARMUP_RATE_TOLERANCE = float(os.getenv('WARMUP_RATE_TOLERANCE', 0.1))
+WARMUP_RATE_WINDOW = float(os.getenv('WARMUP_RATE_WINDOW', 30))
+WARMUP_STABLE_CHECKS = int(os.getenv('WARMUP_STABLE_CHECKS', 3))
+WARMUP_MAX_SECONDS = float(os.getenv('WARMUP_MAX_SECONDS', 30))
+
+DEPENDENCIES_READY = Gauge('startup_dependencies_ready', 'Dependency readiness: -1 while probing, 1 once all dependencies answered, 0 if startup timed out')
+TIME_TO_READY = Gauge('startup_time_to_ready_seconds', 'Time from startup until all dependencies answered')
+TIME_TO_STABLE = Gauge('startup_time_to_stable_seconds', 'Time from readiness until the log processing rate became stable')
+WARMUP_COMPLETE = Gauge('warmup_complete', 'Whether the log processing rate has become stable (1) or not (0)')
+
+class WarmupDetector:
+    """Considers the pipeline warmed up once the processed log rate stops changing"""
+    def __init__(self):
+        self.started_at = None
+        self.samples = deque()
+        self.last_rate = None
+        self.stable_checks = 0
+        self.complete = False
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.samples.clear()
+        self.last_rate = None
+        self.stable_checks = 0
+
+    def observe(self, processed_count):
+        if self.complete:
+            return True
+        if self.started_at is None:
+            self.start()
+
+        # The window grows from the first sample up to WARMUP_RATE_WINDOW, smoothing the analyzer's batched writes
+        now = time.monotonic()
+        self.samples.append((now, processed_count))
+        while len(self.samples) > 1 and now - self.samples[1][0] >= WARMUP_RATE_WINDOW:
+            self.samples.popleft()
+
+        oldest_time, oldest_count = self.samples[0]
+        if now > oldest_time:
+            rate = (processed_count - oldest_count) / (now - oldest_time)
+            # A rate that stays at zero is stable too, so a stalled pipeline does not hold alerts back
+            if self.last_rate is not None and abs(rate - self.last_rate) <= WARMUP_RATE_TOLERANCE * abs(self.last_rate):
+                self.stable_checks += 1
+            else:
+                self.stable_checks = 0
+            self.last_rate = rate
+
+        elapsed = now - self.started_at
+        if self.stable_checks >= WARMUP_STABLE_CHECKS or elapsed >= WARMUP_MAX_SECONDS:
+            self.complete = True
+            WARMUP_COMPLETE.set(1)
+            TIME_TO_STABLE.set(elapsed)
+            if self.stable_checks >= WARMUP_STABLE_CHECKS and self.last_rate == 0:
+                logger.warning(f"No logs processed during {elapsed:.1f} seconds of warm-up, ending warm-up")
+            elif self.stable_checks >= WARMUP_STABLE_CHECKS:
+                logger.info(f"Processing rate stable at {self.last_rate:.2f} logs/sec after {elapsed:.1f} seconds")
+            else:
+                logger.warning(f"Processing rate not stable after {elapsed:.1f} seconds, ending warm-up anyway")
+        return self.complete
+
+def probe_mongodb(mongo_client):
+    try:
+        mongo_client.admin.command('ping')
+        return True
+    except Exception as e:
+        logger.debug(f"MongoDB not ready: {e}")
+        return False
+
+def probe_rabbitmq(connection_params):
+    try:
+        connection = pika.BlockingConnection(connection_params)
+        connection.close()
+        return True
+    except Exception as e:
+        logger.debug(f"RabbitMQ not ready: {e}")
+        return False
+
+def probe_http(urls):
+    for url in urls:
+        try:
+            if requests.get(url, timeout=2).status_code != 200:
+                return False
+        except Exception as e:
+            logger.debug(f"{url} not ready: {e}")
+            return False
+    return True
+
+def wait_for_dependencies(probes, started_at):
+    """Retry the given named probes with exponential backoff until all pass or STARTUP_TIMEOUT expires.
+    Returns whether all dependencies became ready"""
+    probes = dict(probes)
+    delay = STARTUP_BACKOFF_INITIAL
+    DEPENDENCIES_READY.set(-1)
+    while True:
+        for name, probe in list(probes.items()):
+            if probe():
+                logger.info(f"{name} is ready")
+                del probes[name]
+        if not probes:
+            break
+
+        elapsed = time.monotonic() - started_at
+        if elapsed + delay > STARTUP_TIMEOUT:
+            logger.warning(f"Dependencies not ready after {elapsed:.1f} seconds: {', '.join(probes)}. Starting anyway")
+            DEPENDENCIES_READY.set(0)
+            return False
+        logger.info(f"Waiting for {', '.join(probes)}, retrying in {delay:.1f} seconds")
+        time.sleep(delay)
+        delay = min(delay * 2, STARTUP_BACKOFF_MAX)
+
+    time_to_ready = time.monotonic() - started_at
+    DEPENDENCIES_READY.set(1)
+    TIME_TO_READY.set(time_to_ready)
+    logger.info(f"Ready after {time_to_ready:.1f} seconds")
+    return True
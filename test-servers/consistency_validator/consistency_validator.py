@@ -7,6 +7,8 @@ import requests
 from datetime import datetime
 import pika
 from prometheus_client import start_http_server, Gauge, Counter
+from common.instrumentation import PHASE_DURATION, PROFILING_HOST, PROFILING_PORT, start_profiling_server
+from common.startup import WARMUP_CHECK_INTERVAL, WarmupDetector, probe_http, probe_mongodb, probe_rabbitmq, wait_for_dependencies
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +30,7 @@ CONSISTENCY_THRESHOLD_LOW = float(os.getenv('CONSISTENCY_THRESHOLD_LOW', 80))
 CONSISTENCY_THRESHOLD_HIGH = float(os.getenv('CONSISTENCY_THRESHOLD_HIGH', 120))
 PROCESSING_DELAY_ALLOWANCE = int(os.getenv('PROCESSING_DELAY_ALLOWANCE', 120))
 METRICS_PORT = int(os.getenv('METRICS_PORT', 8080))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
 GENERATED_LOGS = Gauge('logs_generated_total', 'Total number of generated logs', ['server'])
 GENERATED_LOGS_TOTAL = Gauge('logs_generated_total_combined', 'Total combined logs generated from all servers')
 PROCESSED_LOGS = Gauge('logs_processed_total', 'Total number of processed logs')
@@ -39,6 +42,8 @@ CONSISTENCY_ERRORS = Counter('consistency_errors_total', 'Total number of consis
 
 class ConsistencyValidator:
     def __init__(self):
+        self.started_at = time.monotonic()
+        self.warmup = WarmupDetector()
         self.mongo_client = None
         self.db = None
         self.collection = None
@@ -49,7 +54,7 @@ class ConsistencyValidator:
 
     def connect_to_mongodb(self):
         try:
-            self.mongo_client = MongoClient(MONGO_URI)
+            self.mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS)
             self.db = self.mongo_client[MONGO_DATABASE]
             self.collection = self.db[MONGO_COLLECTION]
             logger.info(f"Connected to MongoDB at {MONGO_URI}")
@@ -59,8 +64,9 @@ class ConsistencyValidator:
 
     def get_logs_count_from_mongodb(self):
         try:
-            ip_aggregation = list(self.collection.find({"type": "ip"}))
-            endpoint_aggregation = list(self.collection.find({"type": "endpoint"}))
+            with PHASE_DURATION.labels(phase='collection').time():
+                ip_aggregation = list(self.collection.find({"type": "ip"}))
+                endpoint_aggregation = list(self.collection.find({"type": "endpoint"}))
             
             ip_count = sum(doc["count"] for doc in ip_aggregation) if ip_aggregation else 0
             endpoint_count = sum(doc["count"] for doc in endpoint_aggregation) if endpoint_aggregation else 0
@@ -81,15 +87,17 @@ class ConsistencyValidator:
 
         for server_url in PYTHON_SERVER_METRICS_URLS:
             try:
-                response = requests.get(server_url, timeout=5)
+                with PHASE_DURATION.labels(phase='collection').time():
+                    response = requests.get(server_url, timeout=5)
                 if response.status_code == 200:
                     metrics_text = response.text
-                    server_count = 0
-                    for line in metrics_text.split('\n'):
-                        if line.startswith('logs_generated_total'):
-                            value = line.split(' ')[-1]
-                            server_count = int(float(value))
-                            break
+                    with PHASE_DURATION.labels(phase='parsing').time():
+                        server_count = 0
+                        for line in metrics_text.split('\n'):
+                            if line.startswith('logs_generated_total'):
+                                value = line.split(' ')[-1]
+                                server_count = int(float(value))
+                                break
                     
                     server_name = server_url.split('//')[1].split(':')[0]
                     server_counts[server_name] = server_count
@@ -106,23 +114,26 @@ class ConsistencyValidator:
         
         return total_count, server_counts
     
+    def get_rabbitmq_connection_params(self):
+        credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD)
+        return pika.ConnectionParameters(
+            host=RABBITMQ_HOST,
+            port=RABBITMQ_PORT,
+            credentials=credentials,
+            heartbeat=60,
+            socket_timeout=5
+        )
+
     def get_queue_depth(self):
         try:
-            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD)
-            connection_params = pika.ConnectionParameters(
-                host=RABBITMQ_HOST,
-                port=RABBITMQ_PORT,
-                credentials=credentials,
-                heartbeat=60,
-                socket_timeout=5
-            )
-            connection = pika.BlockingConnection(connection_params)
-            channel = connection.channel()
-            
-            queue_info = channel.queue_declare(queue=RABBITMQ_QUEUE, passive=True)
-            message_count = queue_info.method.message_count
-            
-            connection.close()
+            with PHASE_DURATION.labels(phase='collection').time():
+                connection = pika.BlockingConnection(self.get_rabbitmq_connection_params())
+                channel = connection.channel()
+                
+                queue_info = channel.queue_declare(queue=RABBITMQ_QUEUE, passive=True)
+                message_count = queue_info.method.message_count
+                
+                connection.close()
             return message_count
         except Exception as e:
             logger.error(f"Error getting queue depth: {e}")
@@ -133,11 +144,16 @@ class ConsistencyValidator:
         generated_count, server_counts = self.get_generated_logs_counts()
         queue_depth = self.get_queue_depth()
         
+        self.evaluate_consistency(processed_count, generated_count, server_counts, queue_depth)
+
+    @PHASE_DURATION.labels(phase='analysis').time()
+    def evaluate_consistency(self, processed_count, generated_count, server_counts, queue_depth):
         PROCESSED_LOGS.set(processed_count)
         if queue_depth is not None:
             QUEUE_DEPTH.set(queue_depth)
         
         CONSISTENCY_CHECKS.inc()
+        warmed_up = self.warmup.observe(processed_count)
         
         if generated_count == 0:
             logger.warning("Cannot check consistency: no logs generated yet")
@@ -177,6 +193,8 @@ class ConsistencyValidator:
                 else:
                     logger.warning(f"ALERT: Low consistency ({consistency_percentage:.2f}%), potential data loss")
                     CONSISTENCY_ERRORS.inc()
+            elif consistency_percentage > CONSISTENCY_THRESHOLD_HIGH and not warmed_up:
+                logger.info(f"Warming up, high consistency ({consistency_percentage:.2f}%) not alerted until processing rate is stable")
             elif consistency_percentage > CONSISTENCY_THRESHOLD_HIGH:
                 logger.warning(f"ALERT: High consistency ({consistency_percentage:.2f}%), potential duplicate processing")
                 CONSISTENCY_ERRORS.inc()
@@ -221,6 +239,7 @@ class ConsistencyValidator:
             "consistency_percentage": (processed_count / (generated_count - queue_depth) * 100) if (generated_count - queue_depth) > 0 else 0,
             "estimated_queue_processing_time_seconds": estimated_processing_time,
             "trend": self.analyze_trend(),
+            "warmed_up": self.warmup.complete,
             "historical_data": self.historical_consistency[-5:] if len(self.historical_consistency) > 0 else []
         }
         
@@ -240,9 +259,16 @@ class ConsistencyValidator:
         start_http_server(METRICS_PORT)
         logger.info(f"Started Prometheus metrics HTTP server on port {METRICS_PORT}")
         
-        initial_pause = 30
-        logger.info(f"Waiting {initial_pause} seconds for system to stabilize...")
-        time.sleep(initial_pause)
+        if PROFILING_PORT:
+            start_profiling_server(PROFILING_PORT)
+            logger.info(f"Started profiling server on {PROFILING_HOST}:{PROFILING_PORT}")
+        
+        wait_for_dependencies({
+            "MongoDB": lambda: probe_mongodb(self.mongo_client),
+            "RabbitMQ": lambda: probe_rabbitmq(self.get_rabbitmq_connection_params()),
+            "generators": lambda: probe_http(PYTHON_SERVER_METRICS_URLS)
+        }, self.started_at)
+        self.warmup.start()
         
         while True:
             try:
@@ -251,9 +277,8 @@ class ConsistencyValidator:
             except Exception as e:
                 logger.exception(f"Error during consistency check: {e}")
             
-            time.sleep(CHECK_INTERVAL)
+            time.sleep(CHECK_INTERVAL if self.warmup.complete else WARMUP_CHECK_INTERVAL)
 
 if __name__ == "__main__":
-    time.sleep(10)
     validator = ConsistencyValidator()
     validator.run()
\ No newline at end of file
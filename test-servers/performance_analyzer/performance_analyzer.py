@@ -7,6 +7,8 @@ import requests
 from datetime import datetime
 import pika
 from prometheus_client import start_http_server, Gauge, Counter, Histogram
+from common.instrumentation import PHASE_DURATION, PROFILING_HOST, PROFILING_PORT, start_profiling_server
+from common.startup import WARMUP_CHECK_INTERVAL, WarmupDetector, probe_http, probe_mongodb, probe_rabbitmq, wait_for_dependencies
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,6 +27,7 @@ RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'guest')
 RABBITMQ_PASSWORD = os.getenv('RABBITMQ_PASSWORD', 'guest')
 RABBITMQ_QUEUE = os.getenv('RABBITMQ_QUEUE', 'logs')
 METRICS_PORT = int(os.getenv('METRICS_PORT', 8091))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
 PERFORMANCE_THRESHOLD_WARNING = float(os.getenv('PERFORMANCE_THRESHOLD_WARNING', 500))
 PERFORMANCE_THRESHOLD_CRITICAL = float(os.getenv('PERFORMANCE_THRESHOLD_CRITICAL', 1000))
 PROCESSING_TIME_GAUGE = Gauge('log_processing_time_ms', 'Average log processing time in milliseconds', ['component'])
@@ -38,8 +41,14 @@ PERFORMANCE_CHECKS = Counter('performance_checks_total', 'Total number of perfor
 PERFORMANCE_WARNINGS = Counter('performance_warnings_total', 'Total number of performance warnings detected')
 PERFORMANCE_ERRORS = Counter('performance_errors_total', 'Total number of performance errors detected')
 
+def is_server_metric_used(key):
+    """Only keep generator metrics the analysis reads, so history and exports stay small"""
+    return key == 'logs_generated_total' or 'processing_time' in key
+
 class PerformanceAnalyzer:
     def __init__(self):
+        self.started_at = time.monotonic()
+        self.warmup = WarmupDetector()
         self.mongo_client = None
         self.db = None
         self.collection = None
@@ -53,7 +62,7 @@ class PerformanceAnalyzer:
 
     def connect_to_mongodb(self):
         try:
-            self.mongo_client = MongoClient(MONGO_URI)
+            self.mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS)
             self.db = self.mongo_client[MONGO_DATABASE]
             self.collection = self.db[MONGO_COLLECTION]
             logger.info(f"Connected to MongoDB at {MONGO_URI}")
@@ -63,8 +72,9 @@ class PerformanceAnalyzer:
 
     def get_logs_count_from_mongodb(self):
         try:
-            ip_aggregation = list(self.collection.find({"type": "ip"}))
-            endpoint_aggregation = list(self.collection.find({"type": "endpoint"}))
+            with PHASE_DURATION.labels(phase='collection').time():
+                ip_aggregation = list(self.collection.find({"type": "ip"}))
+                endpoint_aggregation = list(self.collection.find({"type": "endpoint"}))
             
             ip_count = sum(doc["count"] for doc in ip_aggregation) if ip_aggregation else 0
             endpoint_count = sum(doc["count"] for doc in endpoint_aggregation) if endpoint_aggregation else 0
@@ -83,17 +93,21 @@ class PerformanceAnalyzer:
 
         for server_url in PYTHON_SERVER_METRICS_URLS:
             try:
-                response = requests.get(server_url, timeout=5)
+                with PHASE_DURATION.labels(phase='collection').time():
+                    response = requests.get(server_url, timeout=5)
                 if response.status_code == 200:
                     metrics_text = response.text
-                    metrics = {}
-                    for line in metrics_text.split('\n'):
-                        if not line.startswith('#') and ' ' in line:
-                            key, value = line.split(' ', 1)
-                            try:
-                                metrics[key] = float(value)
-                            except ValueError:
-                                continue
+                    with PHASE_DURATION.labels(phase='parsing').time():
+                        metrics = {}
+                        for line in metrics_text.split('\n'):
+                            if not line.startswith('#') and ' ' in line:
+                                key, value = line.split(' ', 1)
+                                if not is_server_metric_used(key):
+                                    continue
+                                try:
+                                    metrics[key] = float(value)
+                                except ValueError:
+                                    continue
                     
                     server_name = server_url.split('//')[1].split(':')[0]
                     server_metrics[server_name] = metrics
@@ -105,23 +119,26 @@ class PerformanceAnalyzer:
         
         return server_metrics
     
+    def get_rabbitmq_connection_params(self):
+        credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD)
+        return pika.ConnectionParameters(
+            host=RABBITMQ_HOST,
+            port=RABBITMQ_PORT,
+            credentials=credentials,
+            heartbeat=60,
+            socket_timeout=5
+        )
+
     def get_queue_depth(self):
         try:
-            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD)
-            connection_params = pika.ConnectionParameters(
-                host=RABBITMQ_HOST,
-                port=RABBITMQ_PORT,
-                credentials=credentials,
-                heartbeat=60,
-                socket_timeout=5
-            )
-            connection = pika.BlockingConnection(connection_params)
-            channel = connection.channel()
-            
-            queue_info = channel.queue_declare(queue=RABBITMQ_QUEUE, passive=True)
-            message_count = queue_info.method.message_count
-            
-            connection.close()
+            with PHASE_DURATION.labels(phase='collection').time():
+                connection = pika.BlockingConnection(self.get_rabbitmq_connection_params())
+                channel = connection.channel()
+                
+                queue_info = channel.queue_declare(queue=RABBITMQ_QUEUE, passive=True)
+                message_count = queue_info.method.message_count
+                
+                connection.close()
             return message_count
         except Exception as e:
             logger.error(f"Error getting queue depth: {e}")
@@ -133,7 +150,12 @@ class PerformanceAnalyzer:
         queue_depth = self.get_queue_depth()
         server_metrics = self.get_server_metrics()
         
+        return self.evaluate_performance(current_time, processed_count, queue_depth, server_metrics)
+
+    @PHASE_DURATION.labels(phase='analysis').time()
+    def evaluate_performance(self, current_time, processed_count, queue_depth, server_metrics):
         PERFORMANCE_CHECKS.inc()
+        warmed_up = self.warmup.observe(processed_count)
         
         if queue_depth is not None:
             QUEUE_SIZE.set(queue_depth)
@@ -152,7 +174,9 @@ class PerformanceAnalyzer:
                     LATENCY_HISTOGRAM.labels(component="analyzer").observe(avg_processing_time_ms)
                     logger.info(f"Average processing time: {avg_processing_time_ms:.2f} ms per log")
                     
-                    if avg_processing_time_ms > PERFORMANCE_THRESHOLD_CRITICAL:
+                    if not warmed_up:
+                        logger.info("Warming up, threshold checks suppressed until processing rate is stable")
+                    elif avg_processing_time_ms > PERFORMANCE_THRESHOLD_CRITICAL:
                         logger.error(f"CRITICAL: Processing time ({avg_processing_time_ms:.2f} ms) exceeds critical threshold ({PERFORMANCE_THRESHOLD_CRITICAL} ms)")
                         PERFORMANCE_ERRORS.inc()
                     elif avg_processing_time_ms > PERFORMANCE_THRESHOLD_WARNING:
@@ -237,6 +261,7 @@ class PerformanceAnalyzer:
             "timestamp": datetime.now().isoformat(),
             "current": performance_data,
             "trends": trends_analysis,
+            "warmed_up": self.warmup.complete,
             "historical_data": self.performance_history[-10:] if len(self.performance_history) > 0 else []
         }
         
@@ -265,9 +290,16 @@ class PerformanceAnalyzer:
         start_http_server(METRICS_PORT)
         logger.info(f"Started Prometheus metrics HTTP server on port {METRICS_PORT}")
         
-        initial_pause = 30
-        logger.info(f"Waiting {initial_pause} seconds for system to stabilize...")
-        time.sleep(initial_pause)
+        if PROFILING_PORT:
+            start_profiling_server(PROFILING_PORT)
+            logger.info(f"Started profiling server on {PROFILING_HOST}:{PROFILING_PORT}")
+        
+        wait_for_dependencies({
+            "MongoDB": lambda: probe_mongodb(self.mongo_client),
+            "RabbitMQ": lambda: probe_rabbitmq(self.get_rabbitmq_connection_params()),
+            "generators": lambda: probe_http(PYTHON_SERVER_METRICS_URLS)
+        }, self.started_at)
+        self.warmup.start()
         
         while True:
             try:
@@ -275,9 +307,8 @@ class PerformanceAnalyzer:
             except Exception as e:
                 logger.exception(f"Error during performance analysis: {e}")
             
-            time.sleep(CHECK_INTERVAL)
+            time.sleep(CHECK_INTERVAL if self.warmup.complete else WARMUP_CHECK_INTERVAL)
 
 if __name__ == "__main__":
-    time.sleep(10)
     analyzer = PerformanceAnalyzer()
     analyzer.run()
\ No newline at end of file
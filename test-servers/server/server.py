@@ -7,6 +7,7 @@ import threading
 import datetime
 from faker import Faker
 from prometheus_client import start_http_server, Counter, Gauge
+from common.instrumentation import PHASE_DURATION, PROFILING_HOST, PROFILING_PORT, start_profiling_server
 
 logging.basicConfig(
     level=logging.WARNING,
@@ -88,18 +89,22 @@ def send_logs_worker(worker_id):
             properties = pika.BasicProperties(
                 delivery_mode=1,
             )
+            generation_timer = PHASE_DURATION.labels(phase='generation')
+            publish_timer = PHASE_DURATION.labels(phase='publish')
             
             while True:
-                logs = generate_log_batch(BATCH_SIZE)
+                with generation_timer.time():
+                    logs = generate_log_batch(BATCH_SIZE)
                 
-                for log in logs:
-                    channel.basic_publish(
-                        exchange='',
-                        routing_key=RABBITMQ_QUEUE,
-                        body=log,
-                        properties=properties
-                    )
-                    LOGS_SENT.inc()
+                with publish_timer.time():
+                    for log in logs:
+                        channel.basic_publish(
+                            exchange='',
+                            routing_key=RABBITMQ_QUEUE,
+                            body=log,
+                            properties=properties
+                        )
+                        LOGS_SENT.inc()
                 
                 time.sleep(LOG_INTERVAL)
                 
@@ -135,6 +140,10 @@ def main():
     start_http_server(SERVER_PORT)
     logger.warning(f"Started Prometheus metrics server on port {SERVER_PORT}")
     
+    if PROFILING_PORT:
+        start_profiling_server(PROFILING_PORT)
+        logger.warning(f"Started profiling server on {PROFILING_HOST}:{PROFILING_PORT}")
+    
     logger.warning(f"Starting log generator with {NUM_WORKERS} workers")
     logger.warning(f"Configuration: BATCH_SIZE={BATCH_SIZE}, LOG_INTERVAL={LOG_INTERVAL}")
     